@@ -8,58 +8,119 @@ to not download more concurrently as it will spam the server too much.
 The following pool contains **male/male and male/female explicit images.**
 """
 import asyncio
+import os
+from urllib.parse import urlsplit
 
 import aiohttp
 
 from yippi import AsyncYippiClient
 
-loop = asyncio.get_event_loop()
-concurrent_limit = 4
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
+CHUNK_SIZE = 256 * 1024
+# Chunks read ahead of the disk writes.
+QUEUE_SIZE = 4
 
-def chunks(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i : i + n]
+
+async def save_response(r, image_name):
+    """Write a response body to disk, reading the next chunks from the socket
+    while the previous ones are being written."""
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def reader():
+        async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+            await queue.put(chunk)
+        await queue.put(b"")
+
+    async def writer():
+        # Disk writes are blocking, run them on the default executor so
+        # the event loop is free meanwhile.
+        running_loop = asyncio.get_running_loop()
+        with open(image_name, "wb") as f:
+            while True:
+                chunk = await queue.get()
+                if not chunk:
+                    break  # noqa
+                await running_loop.run_in_executor(None, f.write, chunk)
+
+    tasks = [asyncio.ensure_future(reader()), asyncio.ensure_future(writer())]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # If one side fails, the other would wait on the queue forever, so it
+        # is cancelled and waited for, which also closes the file.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 async def download_post(post, page_number, session):
     print(f"Downloading Post #{post.id}.")
     image_url = post.file["url"]
-    image_name = f"{page_number} - {image_url.split('/')[-1]}"
+    image_name = "%d - %s" % (page_number, os.path.basename(urlsplit(image_url).path))
 
     async with session.get(image_url) as r:
         r.raise_for_status()
-
-        with open(image_name, "wb") as f:
-            while True:
-                chunk = await r.content.read(1024)
-                if not chunk:
-                    break  # noqa
-                f.write(chunk)
+        await save_response(r, image_name)
 
     print(f"Downloaded Post #{post.id}.")
     print(image_name)
 
 
-async def run():
-    global concurrent_limit
+async def worker(queue, session):
+    while True:
+        page_number, post = await queue.get()
+        try:
+            await download_post(post, page_number, session)
+        except Exception as e:
+            print(f"Failed to download Post #{post.id}: {e!r}")
+        finally:
+            queue.task_done()
 
-    page_number = 1
-    session = aiohttp.ClientSession()
-    client = AsyncYippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+
+async def main(session, concurrent_limit):
+    client = AsyncYippiClient(
+        "ExampleDownloader", "0.1", "ExampleUsername", session=session
+    )
 
     pool = (await client.pools("Critical Success"))[0]
     posts = await pool.get_posts()
 
-    tasks = []
-    for post in posts:
-        tasks.append(download_post(post, page_number, session))
-        page_number += 1
-
-    # Chunk into "concurrent_limit" so we don't spam the server
-    for chunked in chunks(tasks, concurrent_limit):
-        await asyncio.gather(*chunked)
-    await session.close()
-
-
-loop.run_until_complete(run())
+    # Only "concurrent_limit" workers download at once, so we don't spam the
+    # server, and the bounded queue keeps just a few posts waiting on them
+    # instead of creating a coroutine for every post upfront.
+    queue = asyncio.Queue(maxsize=concurrent_limit * 2)
+    workers = [
+        asyncio.create_task(worker(queue, session)) for _ in range(concurrent_limit)
+    ]
+    try:
+        for item in enumerate(posts, 1):
+            await queue.put(item)
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def run(concurrent_limit=4):
+    # One session for the whole run, shared by the client and the downloads.
+    # Size the connection pool to the download concurrency, keeping exactly
+    # "concurrent_limit" warm keep-alive sockets to e621.
+    connector = aiohttp.TCPConnector(
+        limit=concurrent_limit, limit_per_host=concurrent_limit, ttl_dns_cache=300
+    )
+    async with aiohttp.ClientSession(
+        connector=connector, read_bufsize=CHUNK_SIZE * 4
+    ) as session:
+        await main(session, concurrent_limit)
+
+
+if uvloop is not None:
+    # uvloop is a drop-in replacement for asyncio's event loop with faster
+    # socket I/O, use it when it's installed.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+asyncio.run(run())
@@ -1,35 +1,120 @@
 """Example of downloading a post asyncronously."""
 import asyncio
+import os
+import threading
+from urllib.parse import urlsplit
 
 import aiohttp
 
 from yippi import AsyncYippiClient
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-async def run():
-    session = aiohttp.ClientSession()
-    client = AsyncYippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+CHUNK_SIZE = 256 * 1024
+# Posts bigger than this are fetched as several byte ranges in parallel.
+RANGED_THRESHOLD = 8 * 1024 * 1024
+PIECE_SIZE = 1024 * 1024
+RANGED_CONNECTIONS = 4
+
+
+seek_lock = threading.Lock()
+
+
+def write_at(fd, data, offset):
+    """Write all of ``data`` to ``fd`` starting at ``offset``."""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            n = os.pwrite(fd, view, offset)
+        else:
+            # No positional writes here, so seeking and writing must not
+            # interleave between executor threads.
+            with seek_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                n = os.write(fd, view)
+        view = view[n:]
+        offset += n
+
+
+async def save_ranged(session, image_url, image_name, size):
+    """Download a large file as several ``Range`` requests in parallel,
+    writing each piece at its offset in a file of the final size."""
+    running_loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(RANGED_CONNECTIONS)
+
+    async def fetch_piece(start):
+        end = min(start + PIECE_SIZE, size) - 1
+        async with sem:
+            headers = {"Range": f"bytes={start}-{end}"}
+            async with session.get(image_url, headers=headers) as r:
+                r.raise_for_status()
+                if r.status != 206:
+                    raise ValueError("Server does not support range requests.")
+                data = await r.read()
+        write = running_loop.run_in_executor(None, write_at, fd, data, start)
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # The write goes on in its thread, let it finish before the fd
+            # gets closed.
+            await write
+            raise
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(image_name, flags, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        tasks = [
+            asyncio.ensure_future(fetch_piece(s)) for s in range(0, size, PIECE_SIZE)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Stop the other pieces when one fails, and wait for all of them,
+            # so none writes to the fd after it is closed, or reused.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        os.close(fd)
+
+
+async def main(session):
+    client = AsyncYippiClient(
+        "ExampleDownloader", "0.1", "ExampleUsername", session=session
+    )
 
     # https://e621.net/posts/1934156
     post = await client.post(1934156)
     image_url = post.file["url"]
-    image_name = image_url.split("/")[-1]
-
-    async with session.get(image_url) as r:
-        r.raise_for_status()
+    image_name = os.path.basename(urlsplit(image_url).path)
 
-        with open(image_name, "wb") as f:
-            while True:
-                chunk = await r.content.read(1024)
-                if not chunk:
-                    break  # noqa
-                f.write(chunk)
+    size = post.file["size"]
+    if size > RANGED_THRESHOLD:
+        await save_ranged(session, image_url, image_name, size)
+    else:
+        async with session.get(image_url) as r:
+            r.raise_for_status()
+            with open(image_name, "wb") as f:
+                async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+                    f.write(chunk)
 
-    await client.close()
     print("Done!")
     print(f"Downloaded Post #{post.id}.")
     print(image_name)
 
 
-loop = asyncio.get_event_loop()
-loop.run_until_complete(run())
+async def run():
+    # One session for the whole run, shared by the client and the downloads.
+    async with aiohttp.ClientSession(read_bufsize=CHUNK_SIZE * 4) as session:
+        await main(session)
+
+
+if uvloop is not None:
+    # uvloop is a drop-in replacement for asyncio's event loop with faster
+    # socket I/O, use it when it's installed.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+asyncio.run(run())
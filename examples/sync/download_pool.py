@@ -3,34 +3,64 @@
 ** WARNING **
 The following pool contains **male/male and male/female explicit images.**
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from yippi import YippiClient
 
-page_number = 1
+concurrent_limit = 4
+CHUNK_SIZE = 256 * 1024
 
 
-def download_post(post):
+def download_post(post, page_number, session):
     print(f"Downloading Post #{post.id}.")
     image_url = post.file["url"]
-    image_name = f"{page_number} - {image_url.split('/')[-1]}"
-
-    r = session.get(image_url, stream=True)
-    r.raise_for_status()
+    image_name = "%d - %s" % (page_number, os.path.basename(urlsplit(image_url).path))
 
-    with open(image_name, "wb") as f:
-        for chunk in r.iter_content(1024):
-            f.write(chunk)
+    # Closing the response hands its connection back to the pool even when
+    # raise_for_status() fails, so blocked workers are never starved.
+    with session.get(image_url, stream=True) as r:
+        r.raise_for_status()
+        with open(image_name, "wb") as f:
+            for chunk in r.iter_content(CHUNK_SIZE):
+                f.write(chunk)
 
     print(f"Downloaded Post #{post.id}.")
     print(image_name)
 
 
-session = requests.Session()
-client = YippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+def main(session):
+    client = YippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+
+    pool = client.pools("Critical Success")[0]
+    posts = pool.get_posts()
+
+    # requests.Session is safe to share between threads for plain GETs, and
+    # its connection pool is already sized for "concurrent_limit" workers.
+    with ThreadPoolExecutor(max_workers=concurrent_limit) as executor:
+        futures = {
+            executor.submit(download_post, post, page_number, session): post
+            for page_number, post in enumerate(posts, 1)
+        }
+        # One failed download is reported without stopping the others.
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to download Post #{futures[future].id}: {e!r}")
+
 
-pool = client.pools("Critical Success")[0]
-posts = pool.get_posts()
-for post in posts:
-    download_post(post)
-    page_number += 1
+# One session for the whole run, shared by the client and the downloads.
+with requests.Session() as session:
+    # Size the connection pool to the download concurrency, keeping at most
+    # "concurrent_limit" warm keep-alive sockets per host (the API and the CDN).
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=2, pool_maxsize=concurrent_limit, pool_block=True),
+    )
+    main(session)
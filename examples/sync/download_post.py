@@ -1,23 +1,141 @@
 """Example of downloading a post asyncronously."""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from urllib.parse import urlsplit
+
 import requests
 
 from yippi import YippiClient
 
-session = requests.Session()
-client = YippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+# Initial read size, adjusted to the measured throughput while downloading.
+CHUNK_SIZE = 256 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+# Posts bigger than this are fetched as several byte ranges in parallel.
+RANGED_THRESHOLD = 8 * 1024 * 1024
+PIECE_SIZE = 1024 * 1024
+RANGED_CONNECTIONS = 4
+
+
+class ChunkSizer:
+    """Picks the read size from an EWMA estimate of the stream's throughput.
+
+    The chunk size doubles while reads keep up with the estimate and halves
+    when they fall behind, staying between ``MIN_CHUNK_SIZE`` and
+    ``MAX_CHUNK_SIZE``.
+    """
+
+    def __init__(self, size=CHUNK_SIZE, alpha=0.9):
+        self.size = size
+        self.alpha = alpha
+        self.throughput = None
+
+    def update(self, nbytes, elapsed):
+        if elapsed <= 0:
+            return
+
+        current = nbytes / elapsed
+        if self.throughput is None:
+            self.throughput = current
+            return
+
+        if current >= self.throughput:
+            self.size = min(self.size * 2, MAX_CHUNK_SIZE)
+        else:
+            self.size = max(self.size // 2, MIN_CHUNK_SIZE)
+        self.throughput = self.alpha * current + (1 - self.alpha) * self.throughput
+
+
+def iter_adaptive(r):
+    """Iterate over a streamed response body in adaptively sized chunks."""
+    sizer = ChunkSizer()
+    while True:
+        started = time.perf_counter()
+        chunk = r.raw.read(sizer.size, decode_content=True)
+        if not chunk:
+            break  # noqa
+        sizer.update(len(chunk), time.perf_counter() - started)
+        yield chunk
+
+
+seek_lock = threading.Lock()
+
+
+def write_at(fd, data, offset):
+    """Write all of ``data`` to ``fd`` starting at ``offset``."""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            n = os.pwrite(fd, view, offset)
+        else:
+            # No positional writes here, so seeking and writing must not
+            # interleave between threads.
+            with seek_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                n = os.write(fd, view)
+        view = view[n:]
+        offset += n
+
+
+def save_ranged(session, image_url, image_name, size):
+    """Download a large file as several ``Range`` requests in parallel,
+    writing each piece at its offset in a file of the final size."""
+
+    def fetch_piece(start):
+        end = min(start + PIECE_SIZE, size) - 1
+        r = session.get(image_url, headers={"Range": f"bytes={start}-{end}"})
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise ValueError("Server does not support range requests.")
+        write_at(fd, r.content, start)
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(image_name, flags, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        with ThreadPoolExecutor(max_workers=RANGED_CONNECTIONS) as executor:
+            futures = [
+                executor.submit(fetch_piece, s) for s in range(0, size, PIECE_SIZE)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                # Skip the pieces not started yet when one fails, and wait for
+                # the running ones, so none writes to the fd after it is closed.
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+    finally:
+        os.close(fd)
+
+
+def main(session):
+    client = YippiClient("ExampleDownloader", "0.1", "ExampleUsername", session)
+
+    # https://e621.net/posts/1934156
+    post = client.post(1934156)
+    image_url = post.file["url"]
+    image_name = os.path.basename(urlsplit(image_url).path)
 
-# https://e621.net/posts/1934156
-post = client.post(1934156)
-image_url = post.file["url"]
-image_name = image_url.split("/")[-1]
+    size = post.file["size"]
+    if size > RANGED_THRESHOLD:
+        save_ranged(session, image_url, image_name, size)
+    else:
+        with session.get(image_url, stream=True) as r:
+            r.raise_for_status()
+            with open(image_name, "wb") as f:
+                for chunk in iter_adaptive(r):
+                    f.write(chunk)
 
-r = session.get(image_url, stream=True)
-r.raise_for_status()
+    print("Done!")
+    print(f"Downloaded Post #{post.id}.")
+    print(image_name)
 
-with open(image_name, "wb") as f:
-    for chunk in r.iter_content(1024):
-        f.write(chunk)
 
-print("Done!")
-print(f"Downloaded Post #{post.id}.")
-print(image_name)
+# One session for the whole run, shared by the client and the downloads.
+with requests.Session() as session:
+    main(session)
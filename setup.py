@@ -69,6 +69,7 @@ setup(
     ],
     python_requires=">=3.7.*",
     install_requires=["requests>=2.23.0", "aiohttp>=3.6.2", "pyrate-limiter>=2.3.4"],
+    extras_require={"speedups": ["orjson>=3.4.0", "aiodns>=2.0.0"]},
     tests_require=[
         "pytest>=5.4.1",
         "pytest-recording>=0.7.0",
@@ -0,0 +1,22 @@
+import asyncio
+
+import aiohttp
+import pytest
+import pytest_asyncio
+
+from yippi import AsyncYippiClient
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def async_client(event_loop):
+    async with aiohttp.ClientSession(loop=event_loop) as session:
+        async_client = AsyncYippiClient("Yippi", "0.1", "Error-", session=session)
+        yield async_client
+        await async_client.close()
@@ -1,13 +1,17 @@
 import os
 
-import aiohttp
 import pytest
-import pytest_asyncio
 import requests
 
 from yippi import AsyncYippiClient
+from yippi import Flag
+from yippi import LazyList
+from yippi import Note
+from yippi import Pool
 from yippi import Post
+from yippi import Tag
 from yippi import YippiClient
+from yippi.Exceptions import UserError
 
 
 @pytest.fixture(scope="module")
@@ -22,23 +26,15 @@ def vcr_cassette_dir(request):
     return "tests/cassettes/classes"
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
     username = os.environ.get("ESIX_USERNAME")
     key = os.environ.get("ESIX_APIKEY")
-    session = requests.Session()
-    client = YippiClient("Yippi", "0.1", "Error-", session=session)
-    if username and key:
-        client.login(username, key)
-    return client
-
-
-@pytest_asyncio.fixture
-async def async_client(event_loop):
-    async with aiohttp.ClientSession(loop=event_loop) as session:
-        async_client = AsyncYippiClient("Yippi", "0.1", "Error-", session=session)
-        yield async_client
-        await async_client.close()
+    with requests.Session() as session:
+        client = YippiClient("Yippi", "0.1", "Error-", session=session)
+        if username and key:
+            client.login(username, key)
+        yield client
 
 
 @pytest.mark.vcr()
@@ -95,12 +91,27 @@ def test_diffgen():
         == ""
     )
     assert p._generate_difference(["furry", "m/m"], ["m/m", "duo"]) == "duo -furry"
+    assert (
+        p._generate_difference(["furry", "m/m", "solo"], ["m/m", "duo", "male"])
+        == "duo male -furry -solo"
+    )
     assert p._generate_difference("furry m/m", "m/m furry duo") == "duo"
     assert p._generate_difference("furry m/m", "m/m") == "-furry"
     with pytest.raises(ValueError):
         p._generate_difference("furry m/m", ["m/m furry duo"])
 
 
+def test_post_without_snapshot():
+    with pytest.raises(UserError, match="did not come"):
+        Post().favorite()
+    assert repr(Post()) == "Post()"
+
+    # Only the id is needed to favorite, so this gets past the endpoint check.
+    post = Post({"id": 1383235})
+    with pytest.raises(UserError, match="client"):
+        post.favorite()
+
+
 def test_create_post():
     Post.from_file("tests/data/sample.jpg")
     with pytest.raises(FileNotFoundError):
@@ -108,3 +119,37 @@ def test_create_post():
     Post.from_url("https://google.com")
     with pytest.raises(ValueError):
         Post.from_url("i.am.an.invalid.url")
+    with pytest.raises(ValueError):
+        Post.from_url("https://google.com\n")
+
+
+def test_lazy_list():
+    built = []
+
+    def factory(data):
+        built.append(data["id"])
+        return Post(data)
+
+    posts = LazyList([{"id": 1}, {"id": 2}, {"id": 3}], factory)
+    assert len(posts) == 3
+    assert not built
+
+    assert posts[-1].id == 3
+    assert posts[-1] is posts[2]
+    assert built == [3]
+
+    assert [p.id for p in posts[:2]] == [1, 2]
+    assert built == [3, 1, 2]
+
+
+def test_original_data_copy():
+    data = {"id": 1, "tags": {"general": ["male"]}, "sources": []}
+    post = Post(data)
+    post.tags["general"].append("solo")
+    assert post._original_data == {"tags": {"general": ["male"]}, "sources": []}
+    assert data["tags"]["general"] == ["male", "solo"]
+
+
+def test_slots():
+    for cls in (Post, Note, Pool, Flag, Tag):
+        assert not hasattr(cls(), "__dict__")
@@ -1,6 +1,7 @@
+import asyncio
+
 import aiohttp
 import pytest
-import pytest_asyncio
 
 from yippi import AsyncYippiClient
 from yippi.Enums import Rating
@@ -13,14 +14,6 @@ def vcr_cassette_dir(request):
     return "tests/cassettes/async"
 
 
-@pytest_asyncio.fixture
-async def client(event_loop):
-    async with aiohttp.ClientSession(loop=event_loop) as session:
-        client = AsyncYippiClient("Yippi", "0.1", "Error-", session=session)
-        yield client
-        await client.close()
-
-
 @pytest.mark.asyncio
 async def test_context(event_loop):
     async with aiohttp.ClientSession(loop=event_loop) as session:
@@ -28,10 +21,18 @@ async def test_context(event_loop):
             pass
 
 
+@pytest.mark.asyncio
+async def test_default_session():
+    async with AsyncYippiClient("Yippi", "0.1", "Error-") as client:
+        connector = client._session.connector
+        assert connector.limit == AsyncYippiClient.CONNECTION_LIMIT
+        assert connector.limit_per_host == AsyncYippiClient.CONNECTION_LIMIT_PER_HOST
+
+
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_getpost(client: AsyncYippiClient):
-    post = await client.post(1383235)
+async def test_getpost(async_client: AsyncYippiClient):
+    post = await async_client.post(1383235)
     assert post.id == 1383235
     assert post.created_at == "2017-11-20T12:23:11.340-05:00"
     assert post.updated_at == "2020-04-17T20:27:20.798-04:00"
@@ -126,33 +127,46 @@ async def test_getpost(client: AsyncYippiClient):
     assert not post.is_favorited
 
 
+@pytest.mark.asyncio
+@pytest.mark.vcr("test_getpost.yaml")
+async def test_coalesce(async_client: AsyncYippiClient):
+    # The cassette only plays the response back once, so both calls must share
+    # a single request.
+    first, second = await asyncio.gather(
+        async_client.post(1383235), async_client.post(1383235)
+    )
+    assert first.id == second.id == 1383235
+    assert first.tags is not second.tags
+    assert not async_client._inflight
+
+
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_404(client: AsyncYippiClient):
+async def test_404(async_client: AsyncYippiClient):
     with pytest.raises(UserError):
-        await client.post(99999999999)
+        await async_client.post(99999999999)
 
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_post_search(client: AsyncYippiClient):
-    assert await client.posts("m/m")
-    assert await client.posts(["m/m", "rating:s"])
-    assert len(await client.posts("m/m", limit=1)) == 1
-    assert await client.posts("m/m", page=1)
+async def test_post_search(async_client: AsyncYippiClient):
+    assert await async_client.posts("m/m")
+    assert await async_client.posts(["m/m", "rating:s"])
+    assert len(await async_client.posts("m/m", limit=1)) == 1
+    assert await async_client.posts("m/m", page=1)
 
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_post_search_error(client: AsyncYippiClient):
+async def test_post_search_error(async_client: AsyncYippiClient):
     with pytest.raises(UserError):
-        await client.posts("m/m", page=1000)
+        await async_client.posts("m/m", page=1000)
 
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_note(client: AsyncYippiClient):
-    note = (await client.notes(post_id=2222254, creator_id=366315, limit=1))[0]
+async def test_note(async_client: AsyncYippiClient):
+    note = (await async_client.notes(post_id=2222254, creator_id=366315, limit=1))[0]
     assert note.id == 257037
     assert note.created_at == "2020-04-19T02:58:56.716-04:00"
     assert note.updated_at == "2020-04-19T02:58:56.716-04:00"
@@ -170,8 +184,8 @@ async def test_note(client: AsyncYippiClient):
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_flags(client: AsyncYippiClient):
-    flag = (await client.flags(post_id=2213076, limit=1))[-1]
+async def test_flags(async_client: AsyncYippiClient):
+    flag = (await async_client.flags(post_id=2213076, limit=1))[-1]
     assert flag.id == 368383
     assert flag.created_at == "2020-04-19T02:50:38.030-04:00"
     assert flag.post_id == 2213076
@@ -184,8 +198,8 @@ async def test_flags(client: AsyncYippiClient):
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_pools(client: AsyncYippiClient):
-    pool = (await client.pools("Critical Success"))[0]
+async def test_pools(async_client: AsyncYippiClient):
+    pool = (await async_client.pools("Critical Success"))[0]
     assert pool.id == 6059
     assert pool.name == "Critical_Success"
     assert pool.created_at == "2015-05-12T03:12:04.070-04:00"
@@ -202,7 +216,55 @@ async def test_pools(client: AsyncYippiClient):
 
 @pytest.mark.asyncio
 @pytest.mark.vcr()
-async def test_500(client: AsyncYippiClient):
+async def test_500(async_client: AsyncYippiClient):
     # We can't simulate e621 error, so we just use external help.
     with pytest.raises(APIError):
-        await client._call_api("GET", "https://httpstat.us/500")
+        await async_client._call_api("GET", "https://httpstat.us/500")
+
+
+def test_should_retry(async_client: AsyncYippiClient):
+    assert async_client._should_retry("GET", 503)
+    assert async_client._should_retry("POST", 429)
+    assert not async_client._should_retry("POST", 503)
+    assert not async_client._should_retry("GET", 500)
+
+
+@pytest.mark.asyncio
+async def test_iter_posts_pages(async_client: AsyncYippiClient, monkeypatch):
+    requested = []
+
+    async def get_posts(tags, limit, page):
+        requested.append((limit, page))
+        count = limit if page < 3 else 1
+        return {"posts": [{"id": page * 1000 + i} for i in range(count)]}
+
+    monkeypatch.setattr(async_client, "_get_posts", get_posts)
+    posts = [post async for post in async_client.iter_posts("male", limit=500)]
+    assert len(posts) == 641
+    assert requested == [(320, 1), (320, 2), (320, 3)]
+
+    requested.clear()
+    posts = [post async for post in async_client.iter_posts("male", limit=None)]
+    assert requested[0] == (AsyncYippiClient.POSTS_PAGE_LIMIT, 1)
+
+
+@pytest.mark.asyncio
+async def test_coalesce_cancelled(async_client: AsyncYippiClient, monkeypatch):
+    async def request(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        raise APIError("Failed.")
+
+    monkeypatch.setattr(async_client, "_request", request)
+    caller = asyncio.ensure_future(
+        async_client._coalesced_request("https://e621.net", {})
+    )
+    await asyncio.sleep(0)
+    (task,) = async_client._inflight.values()
+    caller.cancel()
+    await asyncio.gather(caller, return_exceptions=True)
+
+    # Nobody awaits the request anymore, its error must not be logged as
+    # "never retrieved" once it fails.
+    await asyncio.sleep(0.02)
+    assert task.done()
+    assert not task._log_traceback
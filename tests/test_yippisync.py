@@ -12,10 +12,17 @@ def vcr_cassette_dir(request):
     return "tests/cassettes/sync"
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    session = requests.Session()
-    return YippiClient("Yippi", "0.1", "Error-", session=session)
+    with requests.Session() as session:
+        yield YippiClient("Yippi", "0.1", "Error-", session=session)
+
+
+def test_default_session():
+    client = YippiClient("Yippi", "0.1", "Error-")
+    adapter = client._session.get_adapter("https://e621.net")
+    assert adapter._pool_maxsize == YippiClient.POOL_MAXSIZE
+    assert adapter.max_retries is YippiClient.RETRY
 
 
 @pytest.mark.vcr()
@@ -115,6 +122,45 @@ def test_getpost(client: YippiClient):
     assert not post.is_favorited
 
 
+def test_login():
+    client = YippiClient("Yippi", "0.1", "Error-")
+    assert client._auth is None
+    client.login("Error-", "apikey")
+    assert client._auth.username == "Error-"
+    assert client._auth.password == "apikey"
+
+
+@pytest.mark.vcr("test_getpost.yaml")
+def test_cache():
+    client = YippiClient("Yippi", "0.1", "Error-", cache_ttl=60)
+    post = client.post(1383235)
+    post.tags["general"].append("cached")
+
+    # The cassette only plays the response back once, so this must be a hit.
+    cached = client.post(1383235)
+    assert cached.id == post.id
+    assert "cached" not in cached.tags["general"]
+
+    # Responses fetched anonymously must not be served once logged in.
+    client.login("Error-", "api_key")
+    assert len(client._cache) == 0
+
+    client.clear_cache()
+    assert len(client._cache) == 0
+
+
+@pytest.mark.vcr()
+def test_etag():
+    client = YippiClient("Yippi", "0.1", "Error-", etag_cache_size=16)
+    post = client.post(1383235)
+    post.tags["general"].append("changed")
+
+    # The second recorded response is a 304 without a body.
+    revalidated = client.post(1383235)
+    assert revalidated.id == post.id
+    assert revalidated.tags["general"] == ["male"]
+
+
 @pytest.mark.vcr()
 def test_404(client: YippiClient):
     with pytest.raises(UserError):
@@ -183,8 +229,40 @@ def test_pools(client: YippiClient):
     assert pool.post_count == 48
 
 
+def test_pools_invalid(client: YippiClient):
+    with pytest.raises(UserError):
+        client.pools(category="oneshot")
+    with pytest.raises(UserError):
+        client.pools(order="random")
+
+
 @pytest.mark.vcr()
 def test_500(client: YippiClient):
     with pytest.raises(APIError):
         # We can't simulate e621 error, so we just use external help.
         client._call_api("GET", "https://httpstat.us/500")
+
+
+def test_retry(monkeypatch):
+    client = YippiClient("Yippi", "0.1", "Error-")
+    responses = [requests.Response() for _ in range(3)]
+    for response, status in zip(responses, (503, 503, 204)):
+        response.status_code = status
+    sent = []
+
+    def send(method, *args):
+        sent.append(method)
+        return responses[len(sent) - 1]
+
+    delays = []
+    monkeypatch.setattr(client, "_send", send)
+    monkeypatch.setattr("time.sleep", delays.append)
+    assert client._request("GET", "https://e621.net", None, None, {}) is None
+    assert sent == ["GET"] * 3
+    assert delays == [client.RETRY_BACKOFF, client.RETRY_BACKOFF * 2]
+
+    # A gateway error may come after a write was applied, so it isn't resent.
+    sent.clear()
+    with pytest.raises(APIError):
+        client._request("POST", "https://e621.net", None, None, {})
+    assert sent == ["POST"]
@@ -1,29 +1,42 @@
+import json
 from abc import ABC
 from abc import abstractmethod
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Awaitable
+from typing import Callable
 from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import TypeVar
 from typing import Union
-from urllib.parse import urlencode
 
 from pyrate_limiter import Limiter
 from pyrate_limiter import RequestRate
 
+from .Cache import TTLCache
 from .Classes import Flag
 from .Classes import Note
 from .Classes import Pool
 from .Classes import Post
+from .Classes import _snapshot
 from .Constants import FLAGS_URL
 from .Constants import NOTES_URL
 from .Constants import POOL_URL
 from .Constants import POOLS_URL
 from .Constants import POST_URL
 from .Constants import POSTS_URL
+from .Exceptions import APIError
 from .Exceptions import UserError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 if TYPE_CHECKING:
     import aiohttp
     import requests
@@ -33,6 +46,10 @@ MaybeAwaitable = Union[T, Awaitable[T]]
 RequestResponse = MaybeAwaitable[dict]
 ArrayRequestResponse = MaybeAwaitable[List[dict]]
 limiter = Limiter(RequestRate(2, 1))
+# orjson is an optional speedup, it parses large post pages several times faster.
+json_loads: Callable[[Union[str, bytes]], Any] = (
+    orjson.loads if orjson is not None else json.loads
+)
 
 
 class AbstractYippi(ABC):
@@ -47,26 +64,54 @@ class AbstractYippi(ABC):
         creator: Your e621 username.
         session: The HTTP client session object.
         loop: The event loop to run on. This is only required on async client.
+        cache_ttl: Seconds to keep ``GET`` responses cached for. Defaults to 0,
+            which disables the cache.
+        cache_size: Maximum amount of cached responses.
+        etag_cache_size: Maximum amount of ``GET`` responses to keep along with
+            their ``ETag``, so they can be revalidated with the server instead
+            of downloaded again. Defaults to 0, which disables it.
 
     """
 
-    VALID_CATEGORY = ("series", "collection")
-    VALID_ORDER = ("name", "created_at", "updated_at", "post_count")
+    VALID_CATEGORY = frozenset(("series", "collection"))
+    VALID_ORDER = frozenset(("name", "created_at", "updated_at", "post_count"))
+    MAX_RETRIES = 3
+    RETRY_STATUSES = (429, 502, 503, 504)
+    # A gateway error can come after the server already applied a write, so
+    # those are only retried for requests that are safe to send twice.
+    IDEMPOTENT_METHODS = ("GET", "HEAD")
+    RETRY_BACKOFF = 0.5
 
     def __init__(
         self,
         project_name: str,
         version: str,
         creator: str,
+        cache_ttl: float = 0,
+        cache_size: int = 1024,
+        etag_cache_size: int = 0,
     ) -> None:
-        self.headers = {
-            "User-Agent": f"{project_name}/{version} (by {creator} on e621)"
-        }
+        self.headers: Mapping[str, str] = MappingProxyType(
+            {"User-Agent": f"{project_name}/{version} (by {creator} on e621)"}
+        )
         self._login: Tuple[str, str] = ("", "")
+        self._auth: Any = None
+        self._cache: Optional[TTLCache] = None
+        if cache_ttl > 0:
+            self._cache = TTLCache(cache_size, cache_ttl)
+        # Revalidated entries never expire, they are only evicted when full.
+        self._etags: Optional[TTLCache] = None
+        if etag_cache_size > 0:
+            self._etags = TTLCache(etag_cache_size, float("inf"))
 
     @abstractmethod
     def _call_api(
-        self, method: str, url: str, data: dict = None, **kwargs
+        self,
+        method: str,
+        url: str,
+        data: dict = None,
+        file: dict = None,
+        params: dict = None,
     ) -> MaybeAwaitable[Any]:
         """Calls the API with specified method and url.
 
@@ -74,7 +119,8 @@ class AbstractYippi(ABC):
             method: The method to use.
             url: The URL to call.
             data (Optional): The data to send into the server.
-            **kwargs: Query params to request.
+            file (Optional): The file to upload, as ``requests`` style ``files`` dict.
+            params (Optional): Query params to request.
 
         Returns:
             The client's :obj:`Response` object.
@@ -98,6 +144,139 @@ class AbstractYippi(ABC):
         """
         raise NotImplementedError
 
+    @staticmethod
+    def _request_key(url: str, query: dict) -> Tuple[str, Tuple]:
+        """Builds a hashable key identifying a ``GET`` call.
+
+        Args:
+            url: The URL of the call.
+            query: Query params of the call.
+
+        Returns:
+            The key of the call.
+        """
+        return (url, tuple(sorted(query.items())))
+
+    def _cached_response(self, method: str, url: str, query: dict) -> Any:
+        """Looks up a cached response of a previous ``GET`` call.
+
+        Args:
+            method: The method of the call.
+            url: The URL of the call.
+            query: Query params of the call.
+
+        Returns:
+            A copy of the cached JSON response, or ``None`` if there is none.
+        """
+        if self._cache is None or method != "GET":
+            return None
+
+        cached = self._cache.get(self._request_key(url, query))
+        if cached is None:
+            return None
+        return _snapshot(cached)
+
+    def _store_response(
+        self, method: str, url: str, query: dict, response: Any
+    ) -> None:
+        """Caches the response of a ``GET`` call.
+
+        Any other method may change what the server returns, so it clears
+        the cache instead.
+
+        Args:
+            method: The method of the call.
+            url: The URL of the call.
+            query: Query params of the call.
+            response: The JSON response of the call.
+        """
+        if self._cache is None:
+            return
+
+        if method != "GET":
+            self._cache.clear()
+        elif response is not None:
+            self._cache.set(self._request_key(url, query), _snapshot(response))
+
+    def _revalidation_headers(self, method: str, url: str, query: dict) -> dict:
+        """Builds the headers asking the server to only resend a changed response.
+
+        Args:
+            method: The method of the call.
+            url: The URL of the call.
+            query: Query params of the call.
+
+        Returns:
+            An ``If-None-Match`` header if there is a stored ``ETag`` for the
+            call, otherwise an empty dict.
+        """
+        if self._etags is None or method != "GET":
+            return {}
+
+        stored = self._etags.get(self._request_key(url, query))
+        if stored is None:
+            return {}
+        return {"If-None-Match": stored[0]}
+
+    def _not_modified_response(self, url: str, query: dict) -> Any:
+        """Returns the stored response of a call the server answered with 304.
+
+        Args:
+            url: The URL of the call.
+            query: Query params of the call.
+
+        Returns:
+            A copy of the stored JSON response.
+        """
+        stored = self._etags.get(self._request_key(url, query))  # type: ignore
+        if stored is None:
+            raise APIError("Server reported the response as not modified.")
+        return _snapshot(stored[1])
+
+    def _store_etag(
+        self, method: str, url: str, query: dict, etag: Optional[str], response: Any
+    ) -> None:
+        """Stores a ``GET`` response along with its ``ETag``.
+
+        Args:
+            method: The method of the call.
+            url: The URL of the call.
+            query: Query params of the call.
+            etag: The ``ETag`` header of the response, if any.
+            response: The JSON response of the call.
+        """
+        if self._etags is None or method != "GET" or not etag or response is None:
+            return
+        self._etags.set(self._request_key(url, query), (etag, _snapshot(response)))
+
+    def _should_retry(self, method: str, status: int) -> bool:
+        """Whether a response with ``status`` should be retried.
+
+        Rate limited requests were never handled, so they are always retried.
+        Gateway errors are only retried for idempotent methods.
+        """
+        if status == 429:
+            return True
+        return status in self.RETRY_STATUSES and method in self.IDEMPOTENT_METHODS
+
+    def _retry_delay(self, r: Any, attempt: int) -> float:
+        """Seconds to wait before retrying a rate limited or failed request.
+
+        Honours the server's ``Retry-After`` header when present, otherwise
+        backs off exponentially.
+        """
+        retry_after = r.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.RETRY_BACKOFF * 2**attempt
+
+    def clear_cache(self) -> None:
+        """Removes all cached responses."""
+        if self._cache is not None:
+            self._cache.clear()
+        if self._etags is not None:
+            self._etags.clear()
+
     def _convert_search_query(self, **kwargs) -> dict:
         """Converts keyword arguments into e621's search query dict.
 
@@ -112,27 +291,40 @@ class AbstractYippi(ABC):
                 { "search[key]" : "value"}
 
         """
-        queries = {}
-        for k, v in kwargs.items():
-            if k[-1] == "_":
-                k = k[0:-1]
-            queries[f"search[{k}]"] = v
-        return queries
+        return {
+            f"search[{k[:-1] if k.endswith('_') else k}]": v
+            for k, v in kwargs.items()
+            if v is not None
+        }
 
-    def _generate_query_keys(self, **kwargs) -> str:
-        """Converts keyword arguments into query dict.
+    @staticmethod
+    def _convert_bool(value: Optional[bool]) -> Optional[str]:
+        """Converts a boolean into e621's query format.
 
         Args:
-            **kwargs: Queries to convert.
+            value: The boolean to convert.
 
         Returns:
-            dict: The queries transformed into a dict.
+            ``"true"`` or ``"false"``, or ``None`` if value is ``None``.
         """
-        queries = {}
-        for k, v in kwargs.items():
-            if v:
-                queries[k] = v
-        return urlencode(queries)
+        if value is None:
+            return None
+        return "true" if value else "false"
+
+    def _generate_query_keys(self, params: Optional[dict]) -> dict:
+        """Drops the empty values of a query dict.
+
+        The HTTP client encodes the rest.
+
+        Args:
+            params: Queries to filter.
+
+        Returns:
+            dict: The queries that have a value.
+        """
+        if not params:
+            return {}
+        return {k: v for k, v in params.items() if v}
 
     def _get_posts(
         self,
@@ -156,7 +348,9 @@ class AbstractYippi(ABC):
         """
         if isinstance(tags, list):
             tags = " ".join(tags)
-        return self._call_api("GET", POSTS_URL, tags=tags, limit=limit, page=page)  # type: ignore
+        return self._call_api(  # type: ignore
+            "GET", POSTS_URL, params={"tags": tags, "limit": limit, "page": page}
+        )
 
     def _get_post(self, post_id: int) -> RequestResponse:
         """Internal fetch of posts search.
@@ -171,7 +365,7 @@ class AbstractYippi(ABC):
             JSON object of server's response.
 
         """
-        url = POST_URL + str(post_id) + ".json"
+        url = f"{POST_URL}{post_id}.json"
         return self._call_api("GET", url)  # type: ignore
 
     def _get_flags(
@@ -201,7 +395,7 @@ class AbstractYippi(ABC):
         )
         queries["limit"] = limit
 
-        return self._call_api("GET", FLAGS_URL, **queries)  # type: ignore
+        return self._call_api("GET", FLAGS_URL, params=queries)  # type: ignore
 
     def _get_notes(
         self,
@@ -236,23 +430,17 @@ class AbstractYippi(ABC):
         if isinstance(post_tags_match, list):
             post_tags_match = " ".join(post_tags_match)
 
-        is_active_str: str
-        if is_active is not None:
-            is_active_str = str(is_active).lower()
-        else:
-            is_active_str = ""
-
         queries: dict = self._convert_search_query(
             body_matches=body_matches,
             post_id=post_id,
             post_tags_match=post_tags_match,
             creator_name=creator_name,
             creator_id=creator_id,
-            is_active=is_active_str if is_active_str else None,
+            is_active=self._convert_bool(is_active),
         )
         queries["limit"] = limit
 
-        return self._call_api("GET", NOTES_URL, **queries)  # type: ignore
+        return self._call_api("GET", NOTES_URL, params=queries)  # type: ignore
 
     def _get_pools(
         self,
@@ -294,26 +482,14 @@ class AbstractYippi(ABC):
         if isinstance(id_, list):
             id_ = ",".join(map(str, id_))
 
-        is_active_str: str
-        if is_active is not None:
-            is_active_str = str(is_active).lower()
-        else:
-            is_active_str = ""
-
-        is_deleted_str: str
-        if is_deleted is not None:
-            is_deleted_str = str(is_deleted).lower()
-        else:
-            is_deleted_str = ""
-
         if category and category not in self.VALID_CATEGORY:
+            valid = ", ".join(sorted(self.VALID_CATEGORY))
             raise UserError(
-                f"Invalid category {category}. Valid categories are {self.VALID_CATEGORY}"
+                f"Invalid category {category}. Valid categories are {valid}"
             )
         if order and order not in self.VALID_ORDER:
-            raise UserError(
-                f"Invalid category {order}. Valid categories are {self.VALID_ORDER}"
-            )
+            valid = ", ".join(sorted(self.VALID_ORDER))
+            raise UserError(f"Invalid order {order}. Valid orders are {valid}")
 
         queries: dict = self._convert_search_query(
             name_matches=name_matches,
@@ -321,13 +497,13 @@ class AbstractYippi(ABC):
             description_matches=description_matches,
             creator_name=creator_name,
             creator_id=creator_id,
-            is_active=is_active_str if is_active_str else None,
-            is_deleted=is_deleted_str if is_deleted_str else None,
+            is_active=self._convert_bool(is_active),
+            is_deleted=self._convert_bool(is_deleted),
             category=category,
             order=order,
         )
         queries["limit"] = limit
-        return self._call_api("GET", POOLS_URL, **queries)  # type: ignore
+        return self._call_api("GET", POOLS_URL, params=queries)  # type: ignore
 
     def _get_pool(self, pool_id: int) -> RequestResponse:
         """Internal fetch of pool lookup.
@@ -342,7 +518,7 @@ class AbstractYippi(ABC):
             JSON object of server's response.
 
         """
-        url = POOL_URL + str(pool_id) + ".json"
+        url = f"{POOL_URL}{pool_id}.json"
         return self._call_api("GET", url)  # type: ignore
 
     def login(self, username: str, api_key: str) -> None:
@@ -353,6 +529,9 @@ class AbstractYippi(ABC):
             api_key: Your API key. Find it under "Account" on e621.
         """
         self._login = (username, api_key)
+        # Cached responses were fetched as someone else and may hold their
+        # per-user fields, such as ``is_favorited``.
+        self.clear_cache()
 
     @abstractmethod
     def posts(
@@ -360,7 +539,7 @@ class AbstractYippi(ABC):
         tags: Union[List, str] = None,
         limit: int = None,
         page: Union[int, str] = None,
-    ) -> MaybeAwaitable[List[Post]]:
+    ) -> MaybeAwaitable[Sequence[Post]]:
         """Search for posts.
 
         Args:
@@ -369,7 +548,7 @@ class AbstractYippi(ABC):
             page: The page that will be returned.
 
         Returns:
-            :obj:`list` of :class:`~yippi.Classes.Post` of the posts.
+            :class:`~yippi.Classes.LazyList` of :class:`~yippi.Classes.Post` of the posts.
 
         """
         raise NotImplementedError
@@ -419,7 +598,7 @@ class AbstractYippi(ABC):
         creator_id: int = None,
         is_active: bool = None,
         limit: int = None,
-    ) -> MaybeAwaitable[List[Note]]:
+    ) -> MaybeAwaitable[Sequence[Note]]:
         """Search for notes.
 
         Args:
@@ -434,7 +613,7 @@ class AbstractYippi(ABC):
             limit: Limits the amount of notes returned to the number specified.
 
         Returns:
-            :obj:`list` of :class:`~yippi.Classes.Note` of the notes.
+            :class:`~yippi.Classes.LazyList` of :class:`~yippi.Classes.Note` of the notes.
 
         """
         raise NotImplementedError
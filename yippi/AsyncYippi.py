@@ -1,22 +1,49 @@
+import asyncio
+import math
+from functools import partial
+from itertools import chain
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
 from typing import Union
 
 import aiohttp
 from aiohttp import BasicAuth
 from aiohttp import FormData
+from aiohttp.resolver import AsyncResolver
 
 from .AbstractYippi import AbstractYippi
+from .AbstractYippi import json_loads
 from .AbstractYippi import limiter
 from .Classes import Flag
+from .Classes import LazyList
 from .Classes import Note
 from .Classes import Pool
 from .Classes import Post
+from .Classes import _snapshot
+from .Constants import BASE_URL
+from .Constants import MAX_POSTS_LIMIT
 from .Exceptions import APIError
 from .Exceptions import UserError
 
+try:
+    import aiodns
+except ImportError:  # pragma: no cover
+    aiodns = None  # type: ignore
+
 
 class AsyncYippiClient(AbstractYippi):
+    CONNECTION_LIMIT = 100
+    CONNECTION_LIMIT_PER_HOST = 64
+    KEEPALIVE_TIMEOUT = 75
+    DNS_CACHE_TTL = 300
+    MAX_CONCURRENT_REQUESTS = 64
+    POSTS_PAGE_LIMIT = MAX_POSTS_LIMIT
+
     def __init__(
         self,
         project_name: str,
@@ -24,10 +51,71 @@ class AsyncYippiClient(AbstractYippi):
         creator: str,
         loop=None,
         session: aiohttp.ClientSession = None,
+        cache_ttl: float = 0,
+        cache_size: int = 1024,
+        etag_cache_size: int = 0,
     ) -> None:
+        super().__init__(
+            project_name, version, creator, cache_ttl, cache_size, etag_cache_size
+        )
         self._loop = loop
-        self._session: aiohttp.ClientSession = session or aiohttp.ClientSession()
-        super().__init__(project_name, version, creator)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Created on first use, as on Python < 3.10 a semaphore binds to the
+        # event loop current when it is made, not the one it is used in.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Event loop time until which no request should be sent.
+        self._paused_until = 0.0
+        self._session: aiohttp.ClientSession = session or self._create_session()
+        # Our own session already sends the headers, a user supplied one doesn't.
+        self._request_headers: Optional[Mapping[str, str]] = (
+            self.headers if session else None
+        )
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Creates the session used when none is supplied to the client.
+
+        Idle connections are kept alive between calls, so consecutive requests
+        reuse the same TCP and TLS connection instead of doing a new handshake.
+        Host lookups are cached, and done with aiodns when it is installed
+        instead of blocking a thread on ``getaddrinfo``. The client's headers
+        are set on the session once instead of being merged on every request.
+
+        Returns:
+            The new :obj:`aiohttp.ClientSession`.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.CONNECTION_LIMIT,
+            limit_per_host=self.CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            use_dns_cache=True,
+            ttl_dns_cache=self.DNS_CACHE_TTL,
+            resolver=AsyncResolver() if aiodns is not None else None,
+        )
+        return aiohttp.ClientSession(connector=connector, headers=self.headers)
+
+    def login(self, username: str, api_key: str) -> None:
+        super().login(username, api_key)
+        self._auth = BasicAuth(username, api_key)
+
+    async def warmup(self, connections: int = 4) -> None:
+        """Sends ``HEAD`` requests to e621 ahead of time.
+
+        Call this before a burst of requests so that the first ones don't have
+        to wait for the DNS lookup and the TCP and TLS handshakes. The requests
+        go through the client's rate limiter like any other, so they mostly
+        reuse one another's keep-alive connection instead of each opening one.
+
+        Args:
+            connections: Amount of ``HEAD`` requests to send.
+        """
+
+        async def _head() -> None:
+            async with self._get_semaphore():
+                await self._wait_for_pause()
+                r = await self._send("HEAD", BASE_URL, {}, None, self._request_headers)
+                r.release()
+
+        await asyncio.gather(*(_head() for _ in range(connections)))
 
     async def close(self) -> None:
         await self._session.close()
@@ -38,52 +126,183 @@ class AsyncYippiClient(AbstractYippi):
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         await self.close()
 
-    @limiter.ratelimit("call_api", delay=True)
     async def _call_api(
         self,
         method: str,
         url: str,
         data: Union[dict, FormData] = None,
-        file=None,
-        **kwargs
+        file: dict = None,
+        params: dict = None,
     ) -> Optional[Union[List[dict], dict]]:
-        auth = None
-        if self._login != ("", ""):
-            auth = BasicAuth(*self._login)
+        query = self._generate_query_keys(params)
+        cached = self._cached_response(method, url, query)
+        if cached is not None:
+            return cached
 
+        if method == "GET" and not data and not file:
+            response = await self._coalesced_request(url, query)
+        else:
+            response = await self._request(method, url, data, file, query)
+        self._store_response(method, url, query, response)
+        return response
+
+    async def _coalesced_request(
+        self, url: str, query: dict
+    ) -> Optional[Union[List[dict], dict]]:
+        """Sends a ``GET`` request, sharing it with concurrent identical calls.
+
+        Calls made while the same request is still in flight wait for it
+        instead of sending their own, and get a copy of its response.
+
+        Args:
+            url: The URL to call.
+            query: Query params to request.
+
+        Returns:
+            The JSON response of the server.
+        """
+        key = self._request_key(url, query)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return _snapshot(await asyncio.shield(pending))
+
+        task = asyncio.ensure_future(self._request("GET", url, query=query))
+        # The task outlives its callers if they are all cancelled, so its error
+        # is retrieved here to not be reported as never retrieved.
+        task.add_done_callback(self._retrieve_exception)
+        self._inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    @staticmethod
+    def _retrieve_exception(task: asyncio.Future) -> None:
+        """Marks the exception of a finished task, if any, as retrieved."""
+        if not task.cancelled():
+            task.exception()
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        data: Union[dict, FormData] = None,
+        file: dict = None,
+        query: dict = None,
+    ) -> Optional[Union[List[dict], dict]]:
+        query = query or {}
         if file:
-            file = file["upload[file]"]
-            formdata = FormData()
-            formdata.add_field(
-                "upload[file]", file[1], filename=file[0], content_type=file[2]
-            )
-            formdata.add_fields(data)
-            data = formdata
-
-        query_string = self._generate_query_keys(**kwargs)
-        url += "?" + query_string
-        r = await self._session.request(
-            method, url, data=data, headers=self.headers, auth=auth
-        )
-        await self._verify_response(r)
-        if not r.status == 204:
-            return await r.json()
+            data = self._build_form(data, file)
+
+        headers = self._request_headers
+        revalidation = self._revalidation_headers(method, url, query)
+        if revalidation:
+            headers = {**(headers or {}), **revalidation}
+
+        async with self._get_semaphore():
+            attempt = 0
+            await self._wait_for_pause()
+            r = await self._send(method, url, query, data, headers)
+            # Uploaded form data can only be sent once, so those are not retried.
+            while (
+                attempt < self.MAX_RETRIES
+                and not file
+                and self._should_retry(method, r.status)
+            ):
+                self._pause(self._retry_delay(r, attempt))
+                r.release()
+                await self._wait_for_pause()
+                attempt += 1
+                r = await self._send(method, url, query, data, headers)
+
+            if r.status == 304:
+                r.release()
+                return self._not_modified_response(url, query)
+
+            await self._verify_response(r)
+            if not r.status == 204:
+                response = json_loads(await r.read())
+                self._store_etag(method, url, query, r.headers.get("ETag"), response)
+                return response
 
         return None
 
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Returns the semaphore limiting concurrent requests, creating it if needed."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+        return self._semaphore
+
+    @staticmethod
+    def _build_form(data: Optional[dict], file: dict) -> FormData:
+        """Builds the multipart body of an upload.
+
+        Args:
+            data: The other form fields to send.
+            file: The file to upload, as ``requests`` style ``files`` dict.
+
+        Returns:
+            The :obj:`aiohttp.FormData` to send.
+        """
+        filename, content, content_type = file["upload[file]"][:3]
+        formdata = FormData()
+        formdata.add_field(
+            "upload[file]", content, filename=filename, content_type=content_type
+        )
+        if data:
+            formdata.add_fields(*data.items())
+        return formdata
+
+    @limiter.ratelimit("call_api", delay=True)
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: dict,
+        data: Union[dict, FormData, None],
+        headers: Optional[Mapping[str, str]],
+    ) -> aiohttp.ClientResponse:
+        """Sends a single request, waiting for the rate limiter first."""
+        return await self._session.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            auth=self._auth,
+        )
+
+    def _pause(self, delay: float) -> None:
+        """Holds back every request of this client for ``delay`` seconds.
+
+        When the server starts rate limiting, all the other concurrent requests
+        would most likely get rate limited too, so they wait along with the one
+        that was instead of each backing off on its own.
+        """
+        now = asyncio.get_running_loop().time()
+        self._paused_until = max(self._paused_until, now + delay)
+
+    async def _wait_for_pause(self) -> None:
+        """Waits until the client is no longer paused by :meth:`_pause`."""
+        delay = self._paused_until - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
     async def _verify_response(self, r) -> None:
+        if r.status == 204:
+            return
+
         if 300 <= r.status < 500:
-            res = await r.json()
+            res = json_loads(await r.read())
             if r.status >= 400:
                 raise UserError(res.get("message") or res.get("reason"), json=res)
 
         elif r.status >= 500:
             raise APIError(r.reason)
 
-        if r.status != 204 and (
-            not r.headers.get("Content-Type")
-            or "application/json" not in r.headers.get("Content-Type")
-        ):
+        content_type = r.headers.get("Content-Type")
+        if not content_type or "application/json" not in content_type:
             res = await r.text()
             if "Not found." in res:
                 raise UserError("Not found.")
@@ -94,10 +313,84 @@ class AsyncYippiClient(AbstractYippi):
         tags: Union[List, str] = None,
         limit: int = None,
         page: Union[int, str] = None,
-    ) -> List[Post]:
+    ) -> Sequence[Post]:
         response = await self._get_posts(tags, limit, page)  # type: ignore
-        posts = [Post(p, client=self) for p in response["posts"]]
-        return posts
+        return LazyList(response["posts"], partial(Post, client=self))
+
+    async def posts_pages(
+        self,
+        tags: Union[List, str] = None,
+        limit: int = None,
+        pages: Iterable[int] = (1,),
+    ) -> Sequence[Post]:
+        """Search for posts on several pages, fetched concurrently.
+
+        The pages are still subject to the client's rate limiter, but their
+        round trips overlap instead of being waited for one after another.
+
+        Args:
+            tags: The tags to search.
+            limit: Limits the amount of posts per page.
+            pages: The pages that will be returned.
+
+        Returns:
+            :class:`~yippi.Classes.LazyList` of :class:`~yippi.Classes.Post` of the posts, in page order.
+        """
+        raw_posts = await self._get_posts_pages(tags, limit, pages)
+        return LazyList(raw_posts, partial(Post, client=self))
+
+    async def posts_all(
+        self, tags: Union[List, str] = None, total_limit: int = POSTS_PAGE_LIMIT
+    ) -> Sequence[Post]:
+        """Search for up to ``total_limit`` posts, fetching the pages concurrently.
+
+        Args:
+            tags: The tags to search.
+            total_limit: Maximum amount of posts to return.
+
+        Returns:
+            :class:`~yippi.Classes.LazyList` of :class:`~yippi.Classes.Post` of the posts.
+        """
+        pages = range(1, math.ceil(total_limit / self.POSTS_PAGE_LIMIT) + 1)
+        raw_posts = await self._get_posts_pages(tags, self.POSTS_PAGE_LIMIT, pages)
+        return LazyList(raw_posts[:total_limit], partial(Post, client=self))
+
+    async def iter_posts(
+        self, tags: Union[List, str] = None, limit: int = POSTS_PAGE_LIMIT
+    ) -> AsyncIterator[Post]:
+        """Iterate over every post of a search, requesting one page at a time.
+
+        Only the page being iterated over is kept in memory, so this suits
+        walking through big searches without holding all of their posts.
+
+        Args:
+            tags: The tags to search.
+            limit: Limits the amount of posts per page. e621 never returns more
+                than :data:`~yippi.Constants.MAX_POSTS_LIMIT` per page.
+
+        Yields:
+            :class:`~yippi.Classes.Post` of the posts.
+        """
+        # A short page marks the end, so compare against what a full page holds.
+        limit = min(limit or self.POSTS_PAGE_LIMIT, MAX_POSTS_LIMIT)
+        page = 1
+        while True:
+            response = await self._get_posts(tags, limit, page)  # type: ignore
+            raw_posts = response["posts"]
+            for p in raw_posts:
+                yield Post(p, client=self)
+
+            if len(raw_posts) < limit:
+                return
+            page += 1
+
+    async def _get_posts_pages(
+        self, tags: Union[List, str, None], limit: Optional[int], pages: Iterable[int]
+    ) -> List[dict]:
+        responses = await asyncio.gather(
+            *(self._get_posts(tags, limit, page) for page in pages)  # type: ignore
+        )
+        return list(chain.from_iterable(r["posts"] for r in responses))
 
     async def post(self, post_id: int) -> Post:
         api_res = await self._get_post(post_id)  # type: ignore
@@ -112,7 +405,7 @@ class AsyncYippiClient(AbstractYippi):
         creator_id: int = None,
         is_active: bool = None,
         limit: int = None,
-    ) -> List[Note]:
+    ) -> Sequence[Note]:
         response = await self._get_notes(
             body_matches,
             post_id,
@@ -122,8 +415,7 @@ class AsyncYippiClient(AbstractYippi):
             is_active,
             limit,
         )  # type: ignore
-        result = [Note(n, client=self) for n in response]
-        return result
+        return LazyList(response, partial(Note, client=self))
 
     async def flags(
         self,
@@ -0,0 +1,61 @@
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+
+class TTLCache:
+    """A size-bounded mapping whose entries expire after a fixed time.
+
+    Args:
+        maxsize: Maximum number of entries. The least recently used entry is
+            dropped once it is exceeded.
+        ttl: Seconds an entry stays valid after being stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Looks up a key.
+
+        Args:
+            key: The key to look up.
+
+        Returns:
+            The stored value, or ``None`` if it is missing or has expired.
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries if needed.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._data.clear()
@@ -1,23 +1,33 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
+import math
 import mimetypes
+import os
 import re
 import warnings
 from copy import deepcopy
 from enum import IntEnum
+from functools import lru_cache
+from itertools import chain
 from typing import IO
 from typing import TYPE_CHECKING
 from typing import Awaitable
 from typing import Callable
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
+from typing import Tuple
 from typing import TypeVar
 from typing import Union
 from typing import cast
+from typing import overload
 
 from .Constants import BASE_URL
 from .Constants import FAVORITES_URL
+from .Constants import MAX_POSTS_LIMIT
 from .Constants import NOTE_URL
 from .Constants import NOTES_URL
 from .Constants import POST_URL
@@ -25,6 +35,11 @@ from .Constants import UPLOAD_URL
 from .Enums import Rating
 from .Exceptions import UserError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 if TYPE_CHECKING:
     from .AbstractYippi import AbstractYippi
 
@@ -40,15 +55,142 @@ regex = re.compile(
     r"(?:/?|[/?]\S+)$",
     re.IGNORECASE,
 )
+# Calling an enum looks the value up through its metaclass, which is slow when
+# done for every object of a page, so the value maps are used directly instead.
+_RATINGS = Rating._value2member_map_
+
+# Turns each supported form of tags into a flat list of tags.
+_FLATTEN_TAGS: Dict[type, Callable[..., List[str]]] = {
+    dict: lambda tags: list(chain.from_iterable(tags.values())),
+    str: str.split,
+    list: list,
+    tuple: list,
+}
+
+# Checked before the regex, so most invalid URLs never reach it.
+_URL_PREFIXES = ("http://", "https://", "ftp://", "ftps://")
+
+
+def _copy_json(data: T) -> T:
+    """Deep copies decoded json.
+
+    This is several times faster than :func:`copy.deepcopy`, as json only
+    consists of dicts, lists and immutable scalars. Anything else is still
+    handed to :func:`copy.deepcopy`.
+
+    Args:
+        data: The json to copy.
+
+    Returns:
+        The copy.
+    """
+    data_type = type(data)
+    if data_type is dict:
+        return {k: _copy_json(v) for k, v in data.items()}  # type: ignore
+    if data_type is list:
+        return [_copy_json(v) for v in data]  # type: ignore
+    if data_type in (str, int, float, bool) or data is None:
+        return data
+    return deepcopy(data)
+
+
+def _snapshot(data: T) -> T:
+    """Copies decoded json, such as what a model diffs against later.
+
+    Round-tripping it through orjson is about twice as fast as
+    :func:`_copy_json`, so it is used when installed. Note that it turns
+    tuples into lists, which the json of a response never has anyway.
+
+    Args:
+        data: The json to copy.
+
+    Returns:
+        The copy.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(orjson.dumps(data))  # type: ignore
+        except TypeError:
+            # Not plain json, e.g. non-str keys or integers over 64 bits.
+            pass
+    return _copy_json(data)
+
+
+@lru_cache(maxsize=64)
+def _guess_mime(extension: str) -> Optional[str]:
+    """Guesses the MIME type of a file extension, caching the result.
+
+    Args:
+        extension: The extension, including its leading dot.
+
+    Returns:
+        The MIME type, or ``None`` if it is unknown.
+    """
+    return mimetypes.guess_type("file" + extension)[0]
+
+
+class LazyList(Sequence[T]):
+    """A read-only list that only builds its items once they are accessed.
+
+    Listing endpoints can return hundreds of objects, most of which are often
+    never looked at, so their raw json is kept and wrapped on first access.
+
+    Args:
+        data: The raw json objects of the server response.
+        factory: Builds an item from one of the json objects.
+    """
+
+    __slots__ = ("_data", "_factory", "_items")
+
+    def __init__(self, data: List[dict], factory: Callable[[dict], T]) -> None:
+        self._data = data
+        self._factory = factory
+        self._items: List[Optional[T]] = [None] * len(data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._factory(self._data[index])
+        return item
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, LazyList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyList({list(self)!r})"
 
 
 class _BaseMixin:
+    __slots__ = ("_original_data", "id", "created_at", "updated_at", "__client")
+    # Keys of the json copied into ``_original_data`` to diff against later.
+    _SNAPSHOT_KEYS: Tuple[str, ...] = ()
+
     def __init__(self, json_data: dict, client: AbstractYippi = None) -> None:
+        self._original_data: dict = {}
+        self.id: Optional[int] = None
+        self.created_at: Optional[str] = None
+        self.updated_at: Optional[str] = None
         if json_data:
-            self._original_data: dict = deepcopy(json_data)
-            self.id: Optional[int] = json_data.get("id")
-            self.created_at: Optional[str] = json_data.get("created_at")
-            self.updated_at: Optional[str] = json_data.get("updated_at")
+            snapshot = {k: json_data[k] for k in self._SNAPSHOT_KEYS if k in json_data}
+            if snapshot:
+                self._original_data = _snapshot(snapshot)
+            self.id = json_data.get("id")
+            self.created_at = json_data.get("created_at")
+            self.updated_at = json_data.get("updated_at")
         self.__client = client
 
     @property
@@ -72,6 +214,49 @@ class Post(_BaseMixin):
         https://e621.net/wiki_pages/2425
     """
 
+    __slots__ = (
+        "file_path",
+        "file_url",
+        "file_io",
+        "file",
+        "preview",
+        "sample",
+        "score",
+        "tags",
+        "locked_tags",
+        "change_seq",
+        "flags",
+        "rating",
+        "fav_count",
+        "sources",
+        "pools",
+        "relationships",
+        "approver_id",
+        "uploader_id",
+        "description",
+        "comment_count",
+        "is_favorited",
+        "has_notes",
+        # Only set when uploading.
+        "parent_id",
+        "locked_rating",
+        # Set by Pool.get_posts().
+        "next",
+        "previous",
+    )
+
+    VALID_SCORES = frozenset((1, -1))
+    # Everything Post.update() compares the edited attributes with.
+    _SNAPSHOT_KEYS = (
+        "tags",
+        "sources",
+        "relationships",
+        "description",
+        "rating",
+        "flags",
+        "has_notes",
+    )
+
     def __init__(self, json_data=None, *args, **kwargs) -> None:
         super().__init__(json_data, *args, **kwargs)
         self.file_path: Optional[str] = None
@@ -79,25 +264,29 @@ class Post(_BaseMixin):
         self.file_io: Optional[IO] = None
 
         if json_data:
-            self.file: dict = json_data.get("file")
-            self.preview: dict = json_data.get("preview")
-            self.sample: dict = json_data.get("sample")
-            self.score: dict = json_data.get("score")
-            self.tags: dict = json_data.get("tags")
-            self.locked_tags: list = json_data.get("locked_tags")
-            self.change_seq: int = json_data.get("change_seq")
-            self.flags: dict = json_data.get("flags")
-            self.rating: Rating = Rating(json_data.get("rating"))
-            self.fav_count: int = json_data.get("fav_count")
-            self.sources: list = json_data.get("sources")
-            self.pools: list = json_data.get("pools")
-            self.relationships: dict = json_data.get("relationships")
-            self.approver_id: int = json_data.get("approver_id")
-            self.uploader_id: int = json_data.get("uploader_id")
-            self.description: str = json_data.get("description")
-            self.comment_count: int = json_data.get("comment_count")
-            self.is_favorited: bool = json_data.get("is_favorited")
-            self.has_notes: bool = json_data.get("has_notes")
+            get = json_data.get
+            self.file: dict = get("file")
+            self.preview: dict = get("preview")
+            self.sample: dict = get("sample")
+            self.score: dict = get("score")
+            self.tags: dict = get("tags")
+            self.locked_tags: list = get("locked_tags")
+            self.change_seq: int = get("change_seq")
+            self.flags: dict = get("flags")
+            rating = get("rating")
+            self.rating: Rating = (
+                _RATINGS[rating] if rating in _RATINGS else Rating(rating)
+            )
+            self.fav_count: int = get("fav_count")
+            self.sources: list = get("sources")
+            self.pools: list = get("pools")
+            self.relationships: dict = get("relationships")
+            self.approver_id: int = get("approver_id")
+            self.uploader_id: int = get("uploader_id")
+            self.description: str = get("description")
+            self.comment_count: int = get("comment_count")
+            self.is_favorited: bool = get("is_favorited")
+            self.has_notes: bool = get("has_notes")
 
     def __repr__(self) -> str:
         if self.id:
@@ -124,11 +313,8 @@ class Post(_BaseMixin):
             :obj:`list` of :obj:`str`: List of strings that exists in ``this``, but not in ``that``.
         """
 
-        result = []
-        for e in this:
-            if e not in that:
-                result.append(e)
-        return result
+        lookup = set(that)
+        return [e for e in this if e not in lookup]
 
     def _generate_difference(
         self, original: Union[List, dict, str], new: Union[List, dict, str]
@@ -142,34 +328,20 @@ class Post(_BaseMixin):
         Returns:
             str: e621 formatted difference string.
         """
-        if type(original) != type(new):
+        tags_type = type(original)
+        if tags_type is not type(new):
             raise ValueError("Original and new must have same type.")
 
-        # Transform dict and str into list of differences.
-        if isinstance(original, dict) and isinstance(new, dict):
-            joined_original = []  # type: List[str]
-            joined_new = []  # type: List[str]
-            for k in original.keys():
-                joined_original.extend(original[k])
-                joined_new.extend(new[k])
-
-            original = joined_original
-            new = joined_new
-        elif isinstance(original, str) and isinstance(new, str):
-            original = original.split()
-            new = new.split()
-
-        # At this point, original and new has been transformed into list of tags.
-        assert isinstance(original, list) and isinstance(new, list)
-        deleted = self._diff_list(original, new)
-        added = self._diff_list(new, original)
-
-        output = ""
-        if added:
-            output += " ".join(added)
-        if deleted:
-            output += " -" + " -".join(deleted)
-        return output.strip()
+        flatten = _FLATTEN_TAGS.get(tags_type)
+        if flatten is None:
+            raise ValueError("Tags must be in a form of string, list, tuple or dict.")
+
+        original_tags = flatten(original)
+        new_tags = flatten(new)
+        deleted = self._diff_list(original_tags, new_tags)
+        added = self._diff_list(new_tags, original_tags)
+
+        return " ".join(chain(added, ("-" + tag for tag in deleted)))
 
     def vote(self, score: int = 1, replace: bool = False) -> dict:
         """Vote the post.
@@ -197,7 +369,7 @@ class Post(_BaseMixin):
         if not self.id:
             raise UserError("Post does not come from e621 API.")
 
-        if score not in (1, -1):
+        if score not in self.VALID_SCORES:
             raise UserError("Score must either be 1 or -1.")
 
         data = {"score": score, "no_unvote": replace}
@@ -209,14 +381,15 @@ class Post(_BaseMixin):
 
     @classmethod
     def from_file(cls, path) -> "Post":
+        # Only opened when uploading, so unused posts don't hold a file open.
+        os.stat(path)
         new_post = cls()
-        new_post.file_io = open(path, "rb")
         new_post.file_path = path
         return new_post
 
     @classmethod
     def from_url(cls, url) -> "Post":
-        if not regex.match(url):
+        if not url.lower().startswith(_URL_PREFIXES) or not regex.fullmatch(url):
             raise ValueError(f'URL "{url}" is invalid.')
         new_post = cls()
         new_post.file_url = url
@@ -224,17 +397,10 @@ class Post(_BaseMixin):
 
     def upload(self) -> MaybeAwaitable[dict]:
         warnings.warn("This function has not been tested and should not be used.")
-        if isinstance(self.tags, str):
-            tags = self.tags
-        elif isinstance(self.tags, (list, tuple)):
-            tags = " ".join(self.tags)
-        elif isinstance(self.tags, dict):
-            tags_list = []
-            for k in self.tags.keys():
-                tags_list.extend(self.tags[k])
-            tags = " ".join(self.tags)
-        else:
+        flatten = _FLATTEN_TAGS.get(type(self.tags))
+        if flatten is None:
             raise UserError("Tags must be in a form of string, list, tuple or dict.")
+        tags = " ".join(flatten(self.tags))
 
         sources = "\n".join(self.sources)
         file = None
@@ -245,19 +411,41 @@ class Post(_BaseMixin):
             "upload[description]": self.description or "",
             "upload[parent_id]": getattr(self, "parent_id", ""),
             "upload[locked_tags]": self.locked_tags or "",
-            "uploaad[locked_rating]": str(
-                getattr(self, "locked_rating", False)
-            ).lower(),
+            "upload[locked_rating]": str(getattr(self, "locked_rating", False)).lower(),
         }
-        if hasattr(self, "file_url"):
+        if self.file_url:
             post_data["upload[direct_url]"] = self.file_url
-        else:
-            assert self.file_path
-
-            file_mime = mimetypes.guess_type(self.file_path)[0]
-            file = {"upload[file]": (self.file_path, self.file_io, file_mime, {})}
-
-        return self._client._call_api("POST", UPLOAD_URL, files=file, data=post_data)
+            return self._client._call_api("POST", UPLOAD_URL, data=post_data)
+
+        assert self.file_path
+        file_io = self.file_io or open(self.file_path, "rb")
+        file_mime = _guess_mime(os.path.splitext(self.file_path)[1])
+        file_name = os.path.basename(self.file_path)
+        file = {"upload[file]": (file_name, file_io, file_mime, {})}
+        try:
+            response = self._client._call_api(
+                "POST", UPLOAD_URL, data=post_data, file=file
+            )
+        except BaseException:
+            if file_io is not self.file_io:
+                file_io.close()
+            raise
+
+        # A file given through ``file_io`` is left for its owner to close.
+        if file_io is self.file_io:
+            return response
+        if inspect.isawaitable(response):
+            return self._close_after(response, file_io)
+        file_io.close()
+        return response
+
+    @staticmethod
+    async def _close_after(response: Awaitable[dict], file_io: IO) -> dict:
+        """Awaits an async upload, closing the uploaded file once it's done."""
+        try:
+            return await response
+        finally:
+            file_io.close()
 
     def update(self, reason: str = None) -> MaybeAwaitable[Union[List[dict], dict]]:
         """Updates the post. **This function has not been tested.**
@@ -269,7 +457,7 @@ class Post(_BaseMixin):
             UserError: If the post did not come from any Post endpoint or if no changes has been made.
         """
         warnings.warn("This function has not been tested and should not be used.")
-        if not self._original_data:
+        if self.id is None:
             raise UserError("Post object did not come from Post endpoint.")
 
         post_data = {}
@@ -285,25 +473,28 @@ class Post(_BaseMixin):
         if delta_source:
             post_data["post[source_diff]"] = delta_source
 
-        if self.relationships["parent_id"] != original["relationships"]["parent_id"]:
-            post_data["post[parent_id]"] = self.relationships["parent_id"]
-            post_data["post[old_parent_id]"] = original["relationships"]["parent_id"]
+        parent_id = self.relationships["parent_id"]
+        old_parent_id = original["relationships"]["parent_id"]
+        if parent_id != old_parent_id:
+            post_data["post[parent_id]"] = parent_id
+            post_data["post[old_parent_id]"] = old_parent_id
 
         if self.description != original["description"]:
             post_data["post[description]"] = self.description
             post_data["post[old_description]"] = original["description"]
 
-        if self.rating.value != original["rating"]:
-            post_data["post[rating]"] = self.rating.value
+        rating = self.rating.value
+        if rating != original["rating"]:
+            post_data["post[rating]"] = rating
             post_data["post[old_rating]"] = original["rating"]
 
-        if self.flags["rating_locked"] != original["flags"]["rating_locked"]:
-            post_data["post[is_rating_locked]"] = str(
-                self.flags["rating_locked"]
-            ).lower()
+        flags = self.flags
+        original_flags = original["flags"]
+        if flags["rating_locked"] != original_flags["rating_locked"]:
+            post_data["post[is_rating_locked]"] = str(flags["rating_locked"]).lower()
 
-        if self.flags["note_locked"] != original["flags"]["note_locked"]:
-            post_data["post[is_note_locked]"] = str(self.flags["note_locked"]).lower()
+        if flags["note_locked"] != original_flags["note_locked"]:
+            post_data["post[is_note_locked]"] = str(flags["note_locked"]).lower()
 
         if self.has_notes != original["has_notes"]:
             post_data["post[has_embedded_notes]"] = str(self.has_notes).lower()
@@ -318,14 +509,14 @@ class Post(_BaseMixin):
         )
 
     def favorite(self) -> MaybeAwaitable[dict]:
-        if not self._original_data:
+        if self.id is None:
             raise UserError("Post object did not come from Post endpoint.")
 
         post_data = {"post_id": str(self.id)}
         return self._client._call_api("POST", FAVORITES_URL, data=post_data)
 
     def unfavorite(self) -> None:
-        if not self._original_data:
+        if self.id is None:
             raise UserError("Post object did not come from Post endpoint.")
         self._client._call_api("DELETE", FAVORITES_URL + f"{str(self.id)}.json")
 
@@ -344,18 +535,32 @@ class Note(_BaseMixin):
         https://e621.net/wiki_pages/2425
     """
 
+    __slots__ = (
+        "creator_id",
+        "x",
+        "y",
+        "width",
+        "height",
+        "version",
+        "is_active",
+        "post_id",
+        "body",
+        "creator_name",
+    )
+
     def __init__(self, json_data=None, *args, **kwargs) -> None:
         super().__init__(json_data, *args, **kwargs)
-        self.creator_id: int = json_data.get("creator_id")
-        self.x: int = json_data.get("x")
-        self.y: int = json_data.get("y")
-        self.width: int = json_data.get("width")
-        self.height: int = json_data.get("height")
-        self.version: int = json_data.get("version")
-        self.is_active: bool = json_data.get("is_active")
-        self.post_id: int = json_data.get("post_id")
-        self.body: str = json_data.get("body")
-        self.creator_name: str = json_data.get("creator_name")
+        if json_data:
+            self.creator_id: int = json_data.get("creator_id")
+            self.x: int = json_data.get("x")
+            self.y: int = json_data.get("y")
+            self.width: int = json_data.get("width")
+            self.height: int = json_data.get("height")
+            self.version: int = json_data.get("version")
+            self.is_active: bool = json_data.get("is_active")
+            self.post_id: int = json_data.get("post_id")
+            self.body: str = json_data.get("body")
+            self.creator_name: str = json_data.get("creator_name")
 
     def __repr__(self) -> str:
         return f"Note(id={self.id})"
@@ -474,6 +679,18 @@ class Pool(_BaseMixin):
         https://e621.net/wiki_pages/2425
     """
 
+    __slots__ = (
+        "name",
+        "creator_id",
+        "description",
+        "is_active",
+        "category",
+        "is_deleted",
+        "post_ids",
+        "creator_name",
+        "post_count",
+    )
+
     def __init__(self, json_data=None, *args, **kwargs) -> None:
         super().__init__(json_data, *args, **kwargs)
         if json_data:
@@ -499,10 +716,8 @@ class Pool(_BaseMixin):
         Args:
             arr: List of post to be sorted.
         """
-        sorted_array = []
-        for post_id in self.post_ids:
-            sorted_array.append(next(p for p in arr if p.id == post_id))
-        return sorted_array
+        by_id = {p.id: p for p in arr}
+        return [by_id[post_id] for post_id in self.post_ids if post_id in by_id]
 
     def _register_linked(self, arr: List["Post"]) -> None:
         """Register a series of posts to have ``.continue`` and ``.previous`` attribute.
@@ -512,12 +727,13 @@ class Pool(_BaseMixin):
         Args:
             arr: Series of posts to register.
         """
-        previous = None
-        for current in arr:
-            if previous:
-                previous.next = current
-                current.previous = previous
-            previous = current
+        for previous, current in zip(arr, arr[1:]):
+            previous.next = current
+            current.previous = previous
+
+    def _page_count(self) -> int:
+        """Amount of pages of the largest size needed to fetch every post."""
+        return math.ceil(len(self.post_ids) / MAX_POSTS_LIMIT)
 
     async def get_posts_async(self) -> List["Post"]:
         """Async representation of :meth:`.get-posts()`
@@ -525,17 +741,16 @@ class Pool(_BaseMixin):
         Returns:
             :obj:`list` of :class:`yippi.Classes.Post`: All the posts linked with this pool.
         """
-        result: List["Post"] = []
         get_posts_func = cast(Callable[..., Awaitable[List[Post]]], self._client.posts)
 
-        current_page = 1
-        while len(result) < len(self.post_ids):
-            result.extend(
-                await get_posts_func("pool:" + str(self.id), page=current_page)
+        # The amount of posts is known upfront, so every page is requested at once.
+        pages = await asyncio.gather(
+            *(
+                get_posts_func(f"pool:{self.id}", limit=MAX_POSTS_LIMIT, page=page)
+                for page in range(1, self._page_count() + 1)
             )
-            current_page += 1
-
-        result = self._sort_posts(result)
+        )
+        result = self._sort_posts(list(chain.from_iterable(pages)))
         self._register_linked(result)
         return result
 
@@ -553,10 +768,10 @@ class Pool(_BaseMixin):
         result: List["Post"] = []
         get_posts_func = cast(Callable[..., List[Post]], self._client.posts)
 
-        current_page = 1
-        while len(result) < len(self.post_ids):
-            result.extend(get_posts_func("pool:" + str(self.id), page=current_page))
-            current_page += 1
+        for page in range(1, self._page_count() + 1):
+            result.extend(
+                get_posts_func(f"pool:{self.id}", limit=MAX_POSTS_LIMIT, page=page)
+            )
 
         result = self._sort_posts(result)
         self._register_linked(result)
@@ -609,6 +824,8 @@ class Flag(_BaseMixin):
         https://e621.net/wiki_pages/2425
     """
 
+    __slots__ = ("post_id", "reason", "is_resolved", "is_deletion", "category")
+
     def __init__(self, json_data=None, *args, **kwargs) -> None:
         super().__init__(json_data, *args, **kwargs)
         if json_data:
@@ -645,7 +862,19 @@ class TagCategory(IntEnum):
     LORE = 8
 
 
+_TAG_CATEGORIES = TagCategory._value2member_map_
+
+
 class Tag(_BaseMixin):
+    __slots__ = (
+        "name",
+        "post_count",
+        "related_tags",
+        "related_tags_updated_at",
+        "category",
+        "is_locked",
+    )
+
     def __init__(self, json_data=None, *args, **kwargs) -> None:
         super().__init__(json_data, *args, **kwargs)
         if json_data:
@@ -653,5 +882,10 @@ class Tag(_BaseMixin):
             self.post_count: int = json_data.get("post_count")
             self.related_tags: List[str] = json_data.get("related_tags")
             self.related_tags_updated_at = json_data.get("related_tags_updated_at")
-            self.category: TagCategory = TagCategory(json_data.get("category"))
+            category = json_data.get("category")
+            self.category: TagCategory = (
+                _TAG_CATEGORIES[category]
+                if category in _TAG_CATEGORIES
+                else TagCategory(category)
+            )
             self.is_locked: bool = json_data.get("is_locked")
@@ -9,4 +9,7 @@ FAVORITES_URL = BASE_URL + "/favorites.json"
 POST_URL = BASE_URL + "/posts/"
 NOTE_URL = BASE_URL + "/notes/"
 POOL_URL = BASE_URL + "/pools/"
-FAVORITE_URL = BASE_URL = "/favorites/"
+FAVORITE_URL = BASE_URL + "/favorites/"
+
+# Most posts e621 returns in one page.
+MAX_POSTS_LIMIT = 320
@@ -1,13 +1,21 @@
+import time
+from functools import partial
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
 from typing import Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
 from .AbstractYippi import AbstractYippi
+from .AbstractYippi import json_loads
 from .AbstractYippi import limiter
 from .Classes import Flag
+from .Classes import LazyList
 from .Classes import Note
 from .Classes import Pool
 from .Classes import Post
@@ -16,48 +24,139 @@ from .Exceptions import UserError
 
 
 class YippiClient(AbstractYippi):
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 100
+    # Only connection errors are retried here. Error statuses are retried by
+    # _request(), so the retries also go through the rate limiter.
+    RETRY = Retry(total=3, backoff_factor=0.3, status=0, raise_on_status=False)
+
     def __init__(
         self,
         project_name: str,
         version: str,
         creator: str,
         session: requests.Session = None,
+        cache_ttl: float = 0,
+        cache_size: int = 1024,
+        etag_cache_size: int = 0,
     ) -> None:
-        super().__init__(project_name, version, creator)
-        self._session: requests.Session = session or requests.Session()
+        super().__init__(
+            project_name, version, creator, cache_ttl, cache_size, etag_cache_size
+        )
+        self._session: requests.Session = session or self._create_session()
+        # Our own session already sends the headers, a user supplied one doesn't.
+        self._request_headers: Optional[Mapping[str, str]] = (
+            self.headers if session else None
+        )
+
+    def _create_session(self) -> requests.Session:
+        """Creates the session used when none is supplied to the client.
+
+        The session keeps a pool of connections alive between calls, so
+        consecutive requests reuse the same TCP and TLS connection, and retries
+        requests that failed to connect. The client's
+        headers are set on the session once instead of on every request.
+
+        Returns:
+            The new :obj:`requests.Session`.
+        """
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=self.RETRY,
+        )
+        session.mount("https://", adapter)
+        return session
+
+    def login(self, username: str, api_key: str) -> None:
+        super().login(username, api_key)
+        self._auth = HTTPBasicAuth(username, api_key)
 
-    @limiter.ratelimit("call_api", delay=True)
     def _call_api(
-        self, method: str, url: str, data: dict = None, file=None, **kwargs
+        self,
+        method: str,
+        url: str,
+        data: dict = None,
+        file: dict = None,
+        params: dict = None,
     ) -> Optional[Union[List[dict], dict]]:
-        auth = None
-        if self._login != ("", ""):
-            auth = HTTPBasicAuth(*self._login)
-
-        query_string = self._generate_query_keys(**kwargs)
-        url += "?" + query_string
-        r = self._session.request(
-            method, url, data=data, files=file, headers=self.headers, auth=auth
-        )
+        query = self._generate_query_keys(params)
+        cached = self._cached_response(method, url, query)
+        if cached is not None:
+            return cached
+
+        response = self._request(method, url, data, file, query)
+        self._store_response(method, url, query, response)
+        return response
+
+    def _request(
+        self, method: str, url: str, data: dict, file: Optional[dict], query: dict
+    ) -> Optional[Union[List[dict], dict]]:
+        headers = self._request_headers
+        revalidation = self._revalidation_headers(method, url, query)
+        if revalidation:
+            headers = {**(headers or {}), **revalidation}
+
+        attempt = 0
+        r = self._send(method, url, query, data, file, headers)
+        # Uploaded files are read while being sent, so those are not retried.
+        while (
+            attempt < self.MAX_RETRIES
+            and not file
+            and self._should_retry(method, r.status_code)
+        ):
+            time.sleep(self._retry_delay(r, attempt))
+            attempt += 1
+            r = self._send(method, url, query, data, file, headers)
+
+        if r.status_code == 304:
+            return self._not_modified_response(url, query)
+
         self._verify_response(r)
         if not r.status_code == 204:
-            return r.json()
+            response = json_loads(r.content)
+            self._store_etag(method, url, query, r.headers.get("ETag"), response)
+            return response
 
         return None
 
+    @limiter.ratelimit("call_api", delay=True)
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params: dict,
+        data: Optional[dict],
+        file: Optional[dict],
+        headers: Optional[Mapping[str, str]],
+    ) -> requests.Response:
+        """Sends a single request, waiting for the rate limiter first."""
+        return self._session.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            files=file,
+            headers=headers,
+            auth=self._auth,
+        )
+
     def _verify_response(self, r) -> None:
+        if r.status_code == 204:
+            return
+
         if 300 <= r.status_code < 500:
-            res = r.json()
+            res = json_loads(r.content)
             if r.status_code >= 400:
                 raise UserError(res.get("message") or res.get("reason"), json=res)
 
         elif r.status_code >= 500:
             raise APIError(r.reason)
 
-        if r.status_code != 204 and (
-            not r.headers.get("Content-Type")
-            or "application/json" not in r.headers.get("Content-Type")
-        ):
+        content_type = r.headers.get("Content-Type")
+        if not content_type or "application/json" not in content_type:
             res = r.text
             if "Not found." in res:
                 raise UserError("Not found.")
@@ -68,10 +167,9 @@ class YippiClient(AbstractYippi):
         tags: Union[List, str] = None,
         limit: int = None,
         page: Union[int, str] = None,
-    ) -> List[Post]:
+    ) -> Sequence[Post]:
         response = self._get_posts(tags, limit, page)
-        result = [Post(p, client=self) for p in response["posts"]]  # type: ignore
-        return result
+        return LazyList(response["posts"], partial(Post, client=self))  # type: ignore
 
     def post(self, post_id: int) -> Post:
         response = self._get_post(post_id)
@@ -86,7 +184,7 @@ class YippiClient(AbstractYippi):
         creator_id: int = None,
         is_active: bool = None,
         limit: int = None,
-    ) -> List[Note]:
+    ) -> Sequence[Note]:
         response = self._get_notes(
             body_matches,
             post_id,
@@ -96,8 +194,7 @@ class YippiClient(AbstractYippi):
             is_active,
             limit,
         )
-        result = [Note(n, client=self) for n in response]  # type: ignore
-        return result
+        return LazyList(response, partial(Note, client=self))  # type: ignore
 
     def flags(
         self,